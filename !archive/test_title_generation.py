@@ -3,64 +3,114 @@
 Test script to demonstrate the improved title generation.
 """
 
-import os
-import requests
-from dotenv import load_dotenv
+import asyncio
+import sys
+import aiohttp
+import tiktoken
+from pathlib import Path
 
-def test_title_generation():
-    """Test the improved title generation."""
-    load_dotenv()
-    
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
-        print("Error: OPENAI_API_KEY not found in environment variables")
-        return
-    
-    headers = {
-        "Authorization": f"Bearer {openai_api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    # Test with a sample transcript
-    test_file_name = "20250625_research_meeting.mp3"
-    test_transcript = "Today we discussed the specific aims for the NIH grant proposal. The team reviewed the preliminary data and outlined the key objectives for the next phase of research. We also addressed questions about the methodology and timeline for the project."
-    
-    title_prompt = f"Generate a concise, descriptive title (3-8 words) for this audio recording. Return only the title text, no quotes or extra formatting. Audio filename: {test_file_name}\n\nTranscript preview: {test_transcript[:200]}..."
-    
-    print("=== Testing Improved Title Generation ===\n")
-    print(f"Test file: {test_file_name}")
-    print(f"Transcript preview: {test_transcript[:100]}...")
-    print("\nGenerating title...")
-    
-    try:
-        title_response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # repo root, for config.py
+from config import CONFIG
+
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+MAX_CONCURRENT_REQUESTS = 5  # cap on in-flight title requests
+TITLE_MODEL = CONFIG.title_model  # a small model is plenty for 3-8 words
+
+# Only the opening of a transcript matters for a 3-8 word title
+TITLE_PREVIEW_CHARS = 400  # cheap character cap applied before tokenizing
+TRANSCRIPT_TOKEN_BUDGET = 100  # input tokens actually sent per title
+try:
+    _ENCODING = tiktoken.encoding_for_model(TITLE_MODEL)
+except KeyError:
+    _ENCODING = tiktoken.get_encoding("o200k_base")  # tokenizer of the gpt-4o family
+
+# Straight, curly and backtick quote marks, stripped in one pass
+_QUOTE_TABLE = str.maketrans("", "", '"\u201c\u201d\u2018\u2019\'\u0060')
+
+# Sample (file name, transcript) pairs; titles are generated concurrently
+TEST_RECORDINGS = [
+    (
+        "20250625_research_meeting.mp3",
+        "Today we discussed the specific aims for the NIH grant proposal. The team reviewed the preliminary data and outlined the key objectives for the next phase of research. We also addressed questions about the methodology and timeline for the project."
+    ),
+    (
+        "20250626_cleanroom_training.mp3",
+        "This session covered the gowning procedure for the cleanroom, the safety rules for the wet benches, and how to book time on the mask aligner. We finished with a walkthrough of the waste disposal process."
+    ),
+    (
+        "20250627_advisor_checkin.mp3",
+        "We went over the latest impedance measurements from the platinum black electrodes and decided to repeat the deposition with a lower current density. We also planned the figures for the upcoming conference abstract."
+    ),
+]
+
+def trim_transcript(transcript: str) -> str:
+    """Cut a transcript down to TRANSCRIPT_TOKEN_BUDGET tokens for the title prompt."""
+    tokens = _ENCODING.encode(transcript[:TITLE_PREVIEW_CHARS])
+    if len(transcript) > TITLE_PREVIEW_CHARS or len(tokens) > TRANSCRIPT_TOKEN_BUDGET:
+        print(f"  Warning: Transcript truncated to {TRANSCRIPT_TOKEN_BUDGET} tokens for title generation")
+    return _ENCODING.decode(tokens[:TRANSCRIPT_TOKEN_BUDGET])
+
+async def generate_title(session: aiohttp.ClientSession, file_name: str, transcript: str,
+                         semaphore: asyncio.Semaphore) -> str:
+    """Generate a clean title for one recording; raises on API errors."""
+    title_prompt = f"Generate a concise, descriptive title (3-8 words) for this audio recording. Return only the title text, no quotes or extra formatting. Audio filename: {file_name}\n\nTranscript preview: {trim_transcript(transcript)}..."
+
+    async with semaphore:
+        async with session.post(
+            OPENAI_CHAT_URL,
             json={
-                "model": "gpt-4",
+                "model": TITLE_MODEL,
                 "messages": [
                     {"role": "system", "content": "You are a helpful assistant that generates concise, descriptive titles for audio recordings. Return only the title text without any quotation marks, punctuation, or extra formatting."},
                     {"role": "user", "content": title_prompt}
                 ],
-                "max_tokens": 50,
+                "max_tokens": 20,
                 "temperature": 0.3
             }
-        )
-        
-        if title_response.status_code == 200:
-            ai_title = title_response.json()["choices"][0]["message"]["content"].strip()
-            # Remove any quotation marks that might still be present
-            ai_title = ai_title.replace('"', '').replace('"', '').replace('"', '').replace('"', '').replace("'", '').replace("'", '')
-            final_title = f"{ai_title} - {test_file_name}"
-            
-            print(f"\n✓ Generated title: {final_title}")
-            print(f"✓ Clean title (no quotes): {ai_title}")
-            
-        else:
-            print(f"✗ Error: {title_response.status_code} - {title_response.text}")
-            
-    except Exception as e:
-        print(f"✗ Error: {str(e)}")
+        ) as title_response:
+            if title_response.status != 200:
+                raise Exception(f"{title_response.status} - {await title_response.text()}")
+            ai_title = (await title_response.json())["choices"][0]["message"]["content"].strip()
+
+    # Remove any quotation marks that might still be present
+    return ai_title.translate(_QUOTE_TABLE).strip()
+
+async def generate_titles(openai_api_key: str, recordings):
+    """Generate titles for all recordings over one shared HTTP session."""
+    headers = {
+        "Authorization": f"Bearer {openai_api_key}",
+        "Content-Type": "application/json"
+    }
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    # One session reuses the TCP/TLS connection across all requests
+    async with aiohttp.ClientSession(headers=headers) as session:
+        tasks = [
+            generate_title(session, file_name, transcript, semaphore)
+            for file_name, transcript in recordings
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+def test_title_generation():
+    """Test the improved title generation."""
+    CONFIG.require("openai_api_key")
+
+    print("=== Testing Improved Title Generation ===\n")
+    for test_file_name, test_transcript in TEST_RECORDINGS:
+        print(f"Test file: {test_file_name}")
+        print(f"Transcript preview: {test_transcript[:100]}...")
+    print(f"\nGenerating {len(TEST_RECORDINGS)} titles...")
+
+    results = asyncio.run(generate_titles(CONFIG.openai_api_key, TEST_RECORDINGS))
+
+    for (test_file_name, _), ai_title in zip(TEST_RECORDINGS, results):
+        if isinstance(ai_title, Exception):
+            print(f"\n✗ Error ({test_file_name}): {str(ai_title)}")
+            continue
+        final_title = f"{ai_title} - {test_file_name}"
+
+        print(f"\n✓ Generated title: {final_title}")
+        print(f"✓ Clean title (no quotes): {ai_title}")
 
 if __name__ == "__main__":
-    test_title_generation() 
\ No newline at end of file
+    test_title_generation()
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Shared HTTP helpers for the OpenAI, Notion and Zotero API calls.
+
+All calls share pooled requests.Session objects so TCP/TLS connections
+are reused. Sessions from make_session() retry transient errors inside
+the urllib3 adapter. The *_with_retry helpers instead retry timeouts,
+connection errors and 408/429/5xx responses with tenacity's jittered
+exponential backoff, over a session whose adapter does not retry, so the
+two layers never multiply.
+"""
+
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 6
+MAX_WAIT_SECONDS = 60
+
+USER_AGENT = "audio_to_notion/1.0"
+
+_backoff = wait_random_exponential(min=1, max=MAX_WAIT_SECONDS)
+
+def make_session(pool_connections: int = 10, pool_maxsize: int = 10, **retry_kwargs) -> requests.Session:
+    """Create a pooled session whose https:// adapter retries transient HTTP errors."""
+    retry_options = {
+        "total": 5,
+        "backoff_factor": 1,
+        "status_forcelist": sorted(RETRY_STATUS_CODES),
+        "allowed_methods": None,  # API calls are POSTs too
+        "respect_retry_after_header": True,
+        "raise_on_status": False,  # return the last response instead of raising
+    }
+    retry_options.update(retry_kwargs)
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=pool_connections,
+                                          pool_maxsize=pool_maxsize,
+                                          max_retries=Retry(**retry_options)))
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+SESSION = make_session(total=0)  # tenacity below is the only retry layer for these calls
+
+# OpenAI rate-limit resets are Go-style durations: "20ms", "1s", "1m30s", "6m0s"
+_DURATION_RE = re.compile(r"(?:([\d.]+)h)?(?:([\d.]+)m(?!s))?(?:([\d.]+)s)?(?:([\d.]+)ms)?")
+
+def _parse_duration(value: str):
+    """Return a header duration in seconds: plain seconds or the XhYmZs/ms form."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    match = _DURATION_RE.fullmatch(value.strip())
+    if not match or not any(match.groups()):
+        return None
+    try:
+        hours, minutes, seconds, millis = (float(g) if g else 0.0 for g in match.groups())
+    except ValueError:  # e.g. "1..5s"
+        return None
+    return hours * 3600 + minutes * 60 + seconds + millis / 1000
+
+def _retry_after_seconds(response: requests.Response):
+    """Return the server-requested delay in seconds, if the response has one."""
+    for header in ("Retry-After", "x-ratelimit-reset-requests"):
+        value = response.headers.get(header)
+        if not value:
+            continue
+        delay = _parse_duration(value)
+        if delay is not None:
+            return delay
+    return None
+
+def _wait(retry_state) -> float:
+    """Honor Retry-After style headers, otherwise back off exponentially."""
+    outcome = retry_state.outcome
+    if outcome is not None and not outcome.failed:
+        delay = _retry_after_seconds(outcome.result())
+        if delay is not None:
+            return min(delay, MAX_WAIT_SECONDS)
+    return _backoff(retry_state)
+
+def _is_retryable(response: requests.Response) -> bool:
+    return response.status_code in RETRY_STATUS_CODES
+
+@retry(
+    wait=_wait,
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    retry=(retry_if_result(_is_retryable)
+           | retry_if_exception_type((requests.ConnectionError, requests.Timeout))),
+    # Hand the last response back to the caller instead of raising RetryError
+    retry_error_callback=lambda retry_state: retry_state.outcome.result(),
+)
+def _request_with_retry(method: str, url: str, **kwargs) -> requests.Response:
+    return SESSION.request(method, url, **kwargs)
+
+def _post_with_retry(url: str, **kwargs) -> requests.Response:
+    """POST with retries; returns the final response like requests.post."""
+    return _request_with_retry("POST", url, **kwargs)
+
+def _get_with_retry(url: str, **kwargs) -> requests.Response:
+    """GET with retries; returns the final response like requests.get."""
+    return _request_with_retry("GET", url, **kwargs)
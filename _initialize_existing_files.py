@@ -8,17 +8,168 @@ so they won't be reprocessed by the audio_to_notion.py tool.
 
 import os
 import json
-import hashlib
+import time
+import requests
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Dict, List
+from config import CONFIG
+from _http import _get_with_retry
+from _state import (STATE_VERSION, canon_key, canonicalize_keys, fast_fingerprint,
+                    get_file_hash, iter_mp3s, load_state, save_state, state_entry)
 
-def get_file_hash(file_path: Path) -> str:
-    """Generate a hash for a file to detect changes."""
-    hash_md5 = hashlib.md5()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+OPENAI_API_URL = "https://api.openai.com/v1"
+BATCH_POLL_SECONDS = 60
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+MAX_HASH_WORKERS = 8
+
+def build_title_batch(mp3_files: List[Path], batch_file: Path) -> int:
+    """
+    Write one chat-completions request per MP3 to a Batch API input file.
+
+    Only the file name is available at initialization time (nothing has been
+    transcribed yet), so the prompt is built from the file name alone.
+    """
+    with open(batch_file, 'w') as f:
+        for file_path in mp3_files:
+            title_prompt = f"Generate a concise, descriptive title (3-8 words) for this audio recording. Do not use quotation marks. Return only the title text. Audio filename: {file_path.name}"
+            request = {
+                "custom_id": canon_key(file_path),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": CONFIG.title_model,
+                    "messages": [
+                        {"role": "system", "content": "You are a helpful assistant that generates concise, descriptive titles for audio recordings. Do not use quotation marks. Return only the title text."},
+                        {"role": "user", "content": title_prompt}
+                    ],
+                    "max_tokens": 20,
+                    "temperature": 0.3
+                }
+            }
+            f.write(json.dumps(request) + "\n")
+    return len(mp3_files)
+
+def submit_title_batch(batch_file: Path, api_key: str) -> str:
+    """Upload the batch input file and start a batch job; returns the batch ID."""
+    headers = {"Authorization": f"Bearer {api_key}"}
+
+    with open(batch_file, "rb") as f:
+        upload = requests.post(
+            f"{OPENAI_API_URL}/files",
+            headers=headers,
+            files={"file": (batch_file.name, f, "application/jsonl")},
+            data={"purpose": "batch"}
+        )
+    if upload.status_code != 200:
+        raise Exception(f"Batch file upload failed: {upload.text}")
+
+    batch = requests.post(
+        f"{OPENAI_API_URL}/batches",
+        headers=headers,
+        json={
+            "input_file_id": upload.json()["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h"
+        }
+    )
+    if batch.status_code != 200:
+        raise Exception(f"Batch creation failed: {batch.text}")
+    return batch.json()["id"]
+
+def wait_for_batch(batch_id: str, api_key: str, poll_seconds: int = BATCH_POLL_SECONDS) -> Dict:
+    """Poll a batch job until it reaches a terminal status and return the final batch object."""
+    headers = {"Authorization": f"Bearer {api_key}"}
+
+    while True:
+        # Transient errors are retried; anything else raises with the batch ID saved for a rerun
+        response = _get_with_retry(f"{OPENAI_API_URL}/batches/{batch_id}", headers=headers, timeout=30)
+        if response.status_code != 200:
+            raise Exception(f"Batch status check failed: {response.text}")
+        batch = response.json()
+        status = batch["status"]
+        if status in BATCH_TERMINAL_STATUSES:
+            return batch
+
+        counts = batch.get("request_counts", {})
+        print(f"  Batch {status}: {counts.get('completed', 0)}/{counts.get('total', '?')} requests done")
+        time.sleep(poll_seconds)
+
+def download_batch_titles(output_file_id: str, api_key: str) -> Dict[str, str]:
+    """Download a finished batch's output file and map custom_id to title."""
+    response = _get_with_retry(
+        f"{OPENAI_API_URL}/files/{output_file_id}/content",
+        headers={"Authorization": f"Bearer {api_key}"},
+        timeout=300
+    )
+    if response.status_code != 200:
+        raise Exception(f"Batch output download failed: {response.text}")
+
+    titles = {}
+    for line in response.text.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        body = (result.get("response") or {}).get("body") or {}
+        if result.get("error") or not body.get("choices"):
+            print(f"  Warning: No title returned for {result['custom_id']}")
+            continue
+        ai_title = body["choices"][0]["message"]["content"].strip()
+        titles[result["custom_id"]] = ai_title.replace('"', '').replace("'", '').strip()
+    return titles
+
+def generate_titles_with_batch_api(mp3_files: List[Path], titles_file: Path, api_key: str) -> int:
+    """
+    Generate titles for MP3 files through the OpenAI Batch API.
+
+    Batch requests are billed at half the synchronous price and run under a
+    separate quota, which suits one-off backfills of large archives. Titles
+    are merged into titles_file; returns the number of new titles.
+    """
+    titles = {}
+    if titles_file.exists():
+        with open(titles_file, 'r') as f:
+            titles = json.load(f)
+        titles = {canon_key(Path(k)): v for k, v in titles.items()}
+
+    pending = [p for p in mp3_files if canon_key(p) not in titles]
+    if not pending:
+        print("All files already have titles")
+        return 0
+
+    batch_file = titles_file.with_suffix(".batch.jsonl")
+    # The ID of a submitted batch is kept until its titles are saved, so a rerun
+    # after an interruption resumes that batch instead of paying for a new one
+    batch_id_file = titles_file.with_suffix(".batch_id")
+    if batch_id_file.exists():
+        batch_id = batch_id_file.read_text().strip()
+        print(f"Resuming title batch {batch_id}")
+    else:
+        build_title_batch(pending, batch_file)
+        batch_id = submit_title_batch(batch_file, api_key)
+        batch_id_file.write_text(batch_id)
+        print(f"Submitted title batch {batch_id} for {len(pending)} files")
+
+    batch = wait_for_batch(batch_id, api_key)
+    if batch["status"] != "completed":
+        batch_id_file.unlink()
+        raise Exception(f"Batch {batch_id} ended with status '{batch['status']}'")
+    if batch.get("error_file_id"):
+        print(f"  Warning: Some requests failed; see error file {batch['error_file_id']}")
+    # A batch whose requests all failed completes without an output file
+    if not batch.get("output_file_id"):
+        batch_id_file.unlink()
+        raise Exception(f"Batch {batch_id} produced no output (error file: {batch.get('error_file_id')})")
+
+    new_titles = download_batch_titles(batch["output_file_id"], api_key)
+    titles.update(new_titles)
+
+    with open(titles_file, 'w') as f:
+        json.dump(titles, f, indent=2)
+    batch_id_file.unlink()
+    batch_file.unlink(missing_ok=True)
+    return len(new_titles)
 
 def initialize_existing_files(folder_path: str, state_file: str = "audio_processing_state.json"):
     """
@@ -31,12 +182,17 @@ def initialize_existing_files(folder_path: str, state_file: str = "audio_process
     folder = Path(folder_path)
     state_file_path = Path(state_file)
     
+    # Fail before scanning or hashing anything if the batch backfill cannot run
+    if CONFIG.use_batch_api:
+        CONFIG.require("openai_api_key")
+    
     if not folder.exists():
         print(f"Error: Folder '{folder_path}' does not exist!")
         return False
     
-    # Get all MP3 files in the folder
-    mp3_files = list(folder.glob("*.mp3"))
+    # Get all MP3 files in the folder, fingerprinted during the same scan
+    scanned = [(Path(entry.path), fast_fingerprint(entry)) for entry in iter_mp3s(folder)]
+    mp3_files = [file_path for file_path, _ in scanned]
     
     if not mp3_files:
         print(f"No MP3 files found in '{folder_path}'")
@@ -45,52 +201,85 @@ def initialize_existing_files(folder_path: str, state_file: str = "audio_process
     print(f"Found {len(mp3_files)} MP3 files in '{folder_path}'")
     
     # Load existing state (if any)
-    existing_state = {}
-    if state_file_path.exists():
-        try:
-            with open(state_file_path, 'r') as f:
-                existing_state = json.load(f)
-            print(f"Loaded existing state with {len(existing_state)} files")
-        except (json.JSONDecodeError, FileNotFoundError):
-            print("No existing state found, starting fresh")
+    existing_state = load_state(state_file_path)
+    if existing_state:
+        print(f"Loaded existing state with {len(existing_state)} files")
+    else:
+        print("No existing state found, starting fresh")
+    
+    # Migrate keys written before canonicalization (raw str(path), mixed case)
+    canonical_state = canonicalize_keys(existing_state)
+    keys_migrated = list(canonical_state) != list(existing_state)
+    existing_state = canonical_state
     
     # Process each MP3 file
     new_files_added = 0
     existing_files_updated = 0
+    legacy_entries_migrated = 0
+    already_tracked = 0
     
-    for file_path in mp3_files:
-        file_hash = get_file_hash(file_path)
-        file_key = str(file_path)
-        
-        if file_key in existing_state:
-            if existing_state[file_key] != file_hash:
-                existing_state[file_key] = file_hash
-                existing_files_updated += 1
-                print(f"  Updated: {file_path.name}")
-            else:
-                print(f"  Already tracked: {file_path.name}")
+    # Unchanged size and mtime: trust the entry without reading the file
+    to_hash = []
+    for file_path, fingerprint in scanned:
+        entry = existing_state.get(canon_key(file_path))
+        if (isinstance(entry, dict) and entry.get("version") == STATE_VERSION
+                and (entry.get("size"), entry.get("mtime_ns")) == fingerprint):
+            already_tracked += 1
         else:
-            existing_state[file_key] = file_hash
+            to_hash.append((file_path, fingerprint))
+    
+    # Hash the remaining files across processes; capped to limit SSD contention
+    file_hashes = []
+    if to_hash:
+        paths = [file_path for file_path, _ in to_hash]
+        with ProcessPoolExecutor(max_workers=min(MAX_HASH_WORKERS, os.cpu_count() or 1)) as ex:
+            file_hashes = list(tqdm(ex.map(get_file_hash, paths, chunksize=8),
+                                    total=len(paths), desc="hashing", unit="file"))
+    
+    for (file_path, (size, mtime_ns)), file_hash in zip(to_hash, file_hashes):
+        file_key = canon_key(file_path)
+        entry = existing_state.get(file_key)
+        existing_state[file_key] = state_entry((size, mtime_ns), file_hash)
+        
+        if entry is None:
             new_files_added += 1
-            print(f"  Added: {file_path.name}")
+        elif isinstance(entry, str) or entry.get("version") != STATE_VERSION:
+            # Legacy MD5-only or older-digest entry; upgraded to the current format
+            legacy_entries_migrated += 1
+        elif entry.get("hash") != file_hash:
+            existing_files_updated += 1
+        else:
+            already_tracked += 1
     
-    # Save the updated state
-    with open(state_file_path, 'w') as f:
-        json.dump(existing_state, f, indent=2)
+    # Save the updated state (only rewritten when an entry or key changed)
+    state_changed = bool(to_hash) or keys_migrated
+    if state_changed:
+        save_state(existing_state, state_file_path)
     
     print(f"\n=== Summary ===")
     print(f"Total files in state: {len(existing_state)}")
+    print(f"Already tracked: {already_tracked}")
     print(f"New files added: {new_files_added}")
     print(f"Existing files updated: {existing_files_updated}")
-    print(f"State saved to: {state_file_path}")
+    print(f"Legacy entries migrated: {legacy_entries_migrated}")
+    if state_changed:
+        print(f"State saved to: {state_file_path}")
+    else:
+        print(f"State unchanged: {state_file_path}")
+
+    # Optionally backfill titles through the Batch API (no real-time deadline)
+    if CONFIG.use_batch_api:
+        titles_file = state_file_path.with_name("audio_titles.json")
+        print(f"\n=== Generating titles via Batch API ===")
+        new_titles = generate_titles_with_batch_api(mp3_files, titles_file, CONFIG.openai_api_key)
+        print(f"Titles generated: {new_titles}")
+        print(f"Titles saved to: {titles_file}")
     return True
 
 def main():
     """Main function."""
-    load_dotenv()
-    
     # Get folder path from environment or use default
-    folder_path = os.getenv("AUDIO_FOLDER_PATH", r"D:\OneDrive\Apps\Easy Voice Recorder Pro")
+    folder_path = CONFIG.audio_folder_path or r"D:\OneDrive\Apps\Easy Voice Recorder Pro"
     state_file = "data/audio_processing_state.json"
     
     print("=== Initialize Existing MP3 Files ===\n")
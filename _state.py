@@ -0,0 +1,79 @@
+"""
+Shared helpers for data/audio_processing_state.json.
+
+audio_to_notion.py and _initialize_existing_files.py both read and write
+the state file, so keys, fingerprints, digests and the entry layout live
+here; neither script can drift into a format the other misreads.
+"""
+
+import os
+import sys
+import mmap
+import orjson
+import xxhash
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, Tuple, Union
+
+# Bump when the entry format or content digest changes so old entries get re-hashed
+STATE_VERSION = 2  # unversioned entries hold MD5 digests; 2: xxh3-128 digests
+
+@lru_cache(maxsize=None)
+def _resolved_folder(folder: str) -> str:
+    """Resolve a folder once; every file key in it reuses the result."""
+    return str(Path(folder).resolve())
+
+def canon_key(file_path: Path) -> str:
+    """Return the state-file key for a path; case-insensitive filesystems fold to one key."""
+    # Only the folder is resolved (cached), so building a key costs no per-file filesystem call
+    return os.path.normcase(os.path.join(_resolved_folder(str(file_path.parent)), file_path.name))
+
+def canonicalize_keys(state: Dict) -> Dict:
+    """Migrate keys written before canonicalization (raw str(path), mixed case)."""
+    return {canon_key(Path(k)): v for k, v in state.items()}
+
+def iter_mp3s(folder: Path) -> Iterator[os.DirEntry]:
+    """Yield the MP3 files in a folder from a single directory scan."""
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith('.mp3'):
+                yield entry
+
+def fast_fingerprint(file_path: Union[Path, os.DirEntry]) -> Tuple[int, int]:
+    """Return a cheap (size, mtime_ns) fingerprint from a single stat() call."""
+    # DirEntry.stat() is cached from the scan (free on Windows), Path.stat() is one syscall
+    stat = file_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+def get_file_hash(file_path: Path) -> str:
+    """Generate a content hash for a file to detect changes."""
+    # Non-cryptographic and SIMD-friendly; change detection needs nothing stronger
+    hasher = xxhash.xxh3_128()
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size > 0:  # empty files cannot be mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if sys.platform == "linux":
+                    # Advise the mapping itself: aggressive readahead, and start
+                    # reading the whole file in while the first pages are hashed
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                    mm.madvise(mmap.MADV_WILLNEED)
+                hasher.update(mm)
+    return f"xxh3:{hasher.hexdigest()}"
+
+def state_entry(fingerprint: Tuple[int, int], file_hash: str) -> Dict:
+    """Build the state value for a file: its fingerprint plus content hash."""
+    size, mtime_ns = fingerprint
+    return {"size": size, "mtime_ns": mtime_ns, "hash": file_hash, "version": STATE_VERSION}
+
+def load_state(state_file_path: Path) -> Dict:
+    """Load the state file as written; empty if it is missing or unreadable."""
+    try:
+        return orjson.loads(state_file_path.read_bytes())
+    except (orjson.JSONDecodeError, FileNotFoundError):
+        return {}
+
+def save_state(state: Dict, state_file_path: Path):
+    """Atomically replace the state file so an interrupted run cannot corrupt it."""
+    tmp_path = state_file_path.with_name(state_file_path.name + ".tmp")
+    tmp_path.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, state_file_path)
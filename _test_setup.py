@@ -11,15 +11,14 @@ This script checks:
 """
 
 import os
-import requests
-from dotenv import load_dotenv
+import asyncio
+from config import CONFIG
+from _http import _get_with_retry, _post_with_retry
 
 def test_environment_variables():
     """Test if all required environment variables are set."""
     print("1. Testing environment variables...")
     
-    load_dotenv()
-    
     required_vars = [
         "OPENAI_API_KEY",
         "NOTION_TOKEN", 
@@ -34,16 +33,16 @@ def test_environment_variables():
     
     missing_vars = []
     for var in required_vars:
-        value = os.getenv(var)
+        value = getattr(CONFIG, var.lower())
         if not value:
             missing_vars.append(var)
         else:
             print(f"  ✓ {var}: {'*' * (len(value) - 8) + value[-8:] if len(value) > 8 else '*' * len(value)}")
     
-    # Check optional Zotero variables
+    # Check optional Zotero variables (raw environment, since CONFIG fills in defaults)
     zotero_vars_present = 0
     for var in optional_vars:
-        value = os.getenv(var)
+        value = os.environ.get(var)
         if value:
             zotero_vars_present += 1
             print(f"  ✓ {var}: {'*' * (len(value) - 8) + value[-8:] if len(value) > 8 else '*' * len(value)}")
@@ -64,20 +63,20 @@ def test_environment_variables():
     
     return True
 
-def test_openai_api():
+def test_openai_api(log=print):
     """Test OpenAI API connectivity."""
-    print("\n2. Testing OpenAI API...")
+    log("\n2. Testing OpenAI API...")
     
-    api_key = os.getenv("OPENAI_API_KEY")
+    CONFIG.require("openai_api_key")
     
     headers = {
-        "Authorization": f"Bearer {api_key}",
+        "Authorization": f"Bearer {CONFIG.openai_api_key}",
         "Content-Type": "application/json"
     }
     
     # Test with a simple request
     data = {
-        "model": "gpt-3.5-turbo",
+        "model": CONFIG.title_model,
         "messages": [
             {"role": "user", "content": "Hello, this is a test."}
         ],
@@ -85,7 +84,7 @@ def test_openai_api():
     }
     
     try:
-        response = requests.post(
+        response = _post_with_retry(
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
             json=data,
@@ -93,25 +92,25 @@ def test_openai_api():
         )
         
         if response.status_code == 200:
-            print("  ✓ OpenAI API is accessible")
+            log("  ✓ OpenAI API is accessible")
             return True
         else:
-            print(f"  ✗ OpenAI API error: {response.status_code} - {response.text}")
+            log(f"  ✗ OpenAI API error: {response.status_code} - {response.text}")
             return False
             
     except Exception as e:
-        print(f"  ✗ OpenAI API connection failed: {str(e)}")
+        log(f"  ✗ OpenAI API connection failed: {str(e)}")
         return False
 
-def test_notion_api():
+def test_notion_api(log=print):
     """Test Notion API connectivity."""
-    print("\n3. Testing Notion API...")
+    log("\n3. Testing Notion API...")
     
-    token = os.getenv("NOTION_TOKEN")
-    database_id = os.getenv("NOTION_DATABASE_ID")
+    token = CONFIG.notion_token
+    database_id = CONFIG.notion_database_id
     
     if not token or not database_id:
-        print("  - Notion API test skipped (missing credentials)")
+        log("  - Notion API test skipped (missing credentials)")
         return False
     
     headers = {
@@ -121,34 +120,34 @@ def test_notion_api():
     
     try:
         # Test database access
-        response = requests.get(
+        response = _get_with_retry(
             f"https://api.notion.com/v1/databases/{database_id}",
             headers=headers,
             timeout=30
         )
         
         if response.status_code == 200:
-            print("  ✓ Notion API is accessible")
-            print(f"  ✓ Database found: {response.json().get('title', [{}])[0].get('text', {}).get('content', 'Unknown')}")
+            log("  ✓ Notion API is accessible")
+            log(f"  ✓ Database found: {response.json().get('title', [{}])[0].get('text', {}).get('content', 'Unknown')}")
             return True
         else:
-            print(f"  ✗ Notion API error: {response.status_code} - {response.text}")
+            log(f"  ✗ Notion API error: {response.status_code} - {response.text}")
             return False
             
     except Exception as e:
-        print(f"  ✗ Notion API connection failed: {str(e)}")
+        log(f"  ✗ Notion API connection failed: {str(e)}")
         return False
 
-def test_zotero_api():
+def test_zotero_api(log=print):
     """Test Zotero API connectivity."""
-    print("\n4. Testing Zotero API...")
+    log("\n4. Testing Zotero API...")
     
-    api_key = os.getenv("ZOTERO_API_KEY")
-    user_id = os.getenv("ZOTERO_USER_ID")
-    library_type = os.getenv("ZOTERO_LIBRARY_TYPE", "user")
+    api_key = CONFIG.zotero_api_key
+    user_id = CONFIG.zotero_user_id
+    library_type = CONFIG.zotero_library_type
     
     if not api_key or not user_id:
-        print("  - Zotero API test skipped (missing credentials)")
+        log("  - Zotero API test skipped (missing credentials)")
         return False
     
     headers = {
@@ -158,7 +157,7 @@ def test_zotero_api():
     
     try:
         # Test user library access
-        response = requests.get(
+        response = _get_with_retry(
             f"https://api.zotero.org/{library_type}s/{user_id}/collections",
             headers=headers,
             timeout=30
@@ -166,15 +165,15 @@ def test_zotero_api():
         
         if response.status_code == 200:
             collections = response.json()
-            print("  ✓ Zotero API is accessible")
-            print(f"  ✓ Found {len(collections)} collections in library")
+            log("  ✓ Zotero API is accessible")
+            log(f"  ✓ Found {len(collections)} collections in library")
             return True
         else:
-            print(f"  ✗ Zotero API error: {response.status_code} - {response.text}")
+            log(f"  ✗ Zotero API error: {response.status_code} - {response.text}")
             return False
             
     except Exception as e:
-        print(f"  ✗ Zotero API connection failed: {str(e)}")
+        log(f"  ✗ Zotero API connection failed: {str(e)}")
         return False
 
 def test_file_system():
@@ -210,24 +209,44 @@ def test_file_system():
         print(f"  ✗ File system test failed: {str(e)}")
         return False
 
+NETWORK_PROBES = [
+    test_openai_api,
+    test_notion_api,
+    test_zotero_api
+]
+
+async def _gather_network_probes():
+    """Run the network probes concurrently, buffering each probe's output."""
+    logs = [[] for _ in NETWORK_PROBES]
+    results = await asyncio.gather(
+        *(asyncio.to_thread(probe, log=lines.append) for probe, lines in zip(NETWORK_PROBES, logs)),
+        return_exceptions=True
+    )
+    return results, logs
+
 def main():
     """Run all tests."""
     print("=== Audio to Notion Processor Setup Test ===\n")
     
-    tests = [
-        test_environment_variables,
-        test_openai_api,
-        test_notion_api,
-        test_zotero_api,
-        test_file_system
-    ]
+    results = {}
+    
+    # Printed before the network probes so the environment report comes first
+    results[test_environment_variables] = test_environment_variables()
+    
+    # The API probes are independent and network-bound; wall time is the slowest one
+    network_results, network_logs = asyncio.run(_gather_network_probes())
+    for probe, result, lines in zip(NETWORK_PROBES, network_results, network_logs):
+        for line in lines:
+            print(line)
+        if isinstance(result, Exception):
+            print(f"  ✗ {str(result)}")
+            result = False
+        results[probe] = result
     
-    passed = 0
-    total = len(tests)
+    results[test_file_system] = test_file_system()
     
-    for test in tests:
-        if test():
-            passed += 1
+    passed = sum(1 for result in results.values() if result)
+    total = len(results)
     
     print(f"\n=== Test Results ===")
     print(f"Passed: {passed}/{total}")
@@ -241,9 +260,9 @@ def main():
         
         if passed < total:
             print("\nOptional integrations:")
-            if "Notion" not in [test.__name__ for test in tests if test()]:
+            if not results[test_notion_api]:
                 print("- Set up Notion integration for audio storage")
-            if "Zotero" not in [test.__name__ for test in tests if test()]:
+            if not results[test_zotero_api]:
                 print("- Set up Zotero integration for literature management")
         
         return 0
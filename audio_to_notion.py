@@ -1,14 +1,53 @@
 import os
+import re
 import json
 import hashlib
-import requests
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
-from dotenv import load_dotenv
-from pydub import AudioSegment
+from bisect import bisect_right
+from functools import partial
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import CONFIG
+from _state import (canon_key, canonicalize_keys, fast_fingerprint, get_file_hash,
+                    iter_mp3s, load_state, save_state, state_entry)
+from _http import make_session
+import shutil
+import subprocess
 import tempfile
 
+NOTION_MAX_CHILDREN = 100  # Notion's limit on blocks per create/append request
+SUMMARY_MAX_WORDS = 300  # keeps the JSON reply well inside its max_tokens
+CHUNK_WORKERS = 8  # chunk transcodes + Whisper uploads running at once, across all files
+
+_PRINT_LOCK = threading.Lock()
+
+def _log(file_name: str, *lines: str):
+    """Print progress lines tagged with their recording; files are processed in parallel."""
+    with _PRINT_LOCK:  # keep a multi-line message from interleaving with other files
+        print("\n".join(f"[{file_name}] {line}" for line in lines))
+
+_TITLE_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9'-]{2,}")
+_TIMESTAMP_RE = re.compile(r"[\dT:_\-\s]+")
+
+def _descriptive_title(file_name: str) -> Optional[str]:
+    """Return the file stem if it already reads as a title (3+ words, not a timestamp)."""
+    stem = Path(file_name).stem
+    if len(_TITLE_WORD_RE.findall(stem)) >= 3 and not _TIMESTAMP_RE.fullmatch(stem):
+        return stem
+    return None
+
+def _para(content: str) -> Dict:
+    """Notion paragraph block holding plain text."""
+    return {"object": "block", "type": "paragraph",
+            "paragraph": {"rich_text": [{"type": "text", "text": {"content": content}}]}}
+
+def _h2(content: str) -> Dict:
+    """Notion heading_2 block holding plain text."""
+    return {"object": "block", "type": "heading_2",
+            "heading_2": {"rich_text": [{"type": "text", "text": {"content": content}}]}}
+
 class AudioToNotionProcessor:
     def __init__(self, folder_path: str, state_file: str = "audio_processing_state.json"):
         """
@@ -18,181 +57,254 @@ class AudioToNotionProcessor:
             folder_path: Path to the folder containing MP3 files
             state_file: JSON file to track processed files
         """
-        load_dotenv()
-        
         self.folder_path = Path(folder_path)
         self.state_file = Path(state_file)
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.notion_token = os.getenv("NOTION_TOKEN")
-        self.notion_database_id = os.getenv("NOTION_DATABASE_ID")
         
         # Validate required environment variables
-        if not self.openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-        if not self.notion_token:
-            raise ValueError("NOTION_TOKEN environment variable is required")
-        if not self.notion_database_id:
-            raise ValueError("NOTION_DATABASE_ID environment variable is required")
+        CONFIG.require("openai_api_key", "notion_token", "notion_database_id")
+        self.openai_api_key = CONFIG.openai_api_key
+        self.notion_token = CONFIG.notion_token
+        self.notion_database_id = CONFIG.notion_database_id
+        
+        # Shared across worker threads so HTTPS connections are reused; 429/5xx are retried
+        self.session = make_session(pool_connections=16, pool_maxsize=32,
+                                    backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        # Notion page/block writes are not idempotent: a 5xx or read timeout may follow a
+        # write that already landed, so only 429 (rejected before any write) is retried
+        self.notion_session = make_session(pool_connections=4, pool_maxsize=16,
+                                           backoff_factor=0.5, status_forcelist=[429], read=0)
+        
+        # One pool for every file's chunks, so parallel files cannot multiply the
+        # ffmpeg transcodes and Whisper uploads in flight
+        self.chunk_pool = ThreadPoolExecutor(max_workers=CHUNK_WORKERS)
         
         # Load previous state
-        self.processed_files = self._load_state()
-        
-    def _load_state(self) -> Dict[str, str]:
-        """Load the state of previously processed files."""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return {}
-        return {}
+        self.processed_files = canonicalize_keys(load_state(self.state_file))
+    
+    def close(self):
+        """Shut down the chunk pool and release pooled HTTP connections."""
+        self.chunk_pool.shutdown()
+        self.session.close()
+        self.notion_session.close()
     
-    def _save_state(self):
-        """Save the current state of processed files."""
-        with open(self.state_file, 'w') as f:
-            json.dump(self.processed_files, f, indent=2)
+    def __enter__(self) -> "AudioToNotionProcessor":
+        return self
     
-    def _get_file_hash(self, file_path: Path) -> str:
-        """Generate a hash for a file to detect changes."""
-        hash_md5 = hashlib.md5()
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _get_legacy_hash(self, file_path: Path) -> str:
+        """MD5 digest as stored by earlier versions (digests without a prefix)."""
+        hash_md5 = hashlib.md5(usedforsecurity=False)
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            for chunk in iter(lambda: f.read(1 << 20), b""):
                 hash_md5.update(chunk)
         return hash_md5.hexdigest()
     
+    def _matches_stored_hash(self, file_path: Path, stored_hash: Optional[str], file_hash: str) -> bool:
+        """Check a file against a digest in any format this state file has held."""
+        if not stored_hash:
+            return False
+        if stored_hash.startswith("xxh3:"):
+            return stored_hash == file_hash
+        return stored_hash == self._get_legacy_hash(file_path)
+    
     def _get_mp3_files(self) -> List[Path]:
         """Get all MP3 files in the monitored folder."""
         mp3_files = []
         if self.folder_path.exists():
-            mp3_files = list(self.folder_path.glob("*.mp3"))
+            # Same case-insensitive scan as _initialize_existing_files, so X.MP3 is seen by both
+            mp3_files = [Path(entry.path) for entry in iter_mp3s(self.folder_path)]
         return mp3_files
     
-    def _get_new_files(self) -> List[Path]:
-        """Identify new or modified MP3 files."""
+    def _get_new_files(self) -> List[Tuple[Path, Dict]]:
+        """Identify new or modified MP3 files; returns (path, state entry to save once processed) pairs."""
         current_files = self._get_mp3_files()
         new_files = []
+        state_changed = False
         
         for file_path in current_files:
-            file_hash = self._get_file_hash(file_path)
-            if (str(file_path) not in self.processed_files or 
-                self.processed_files[str(file_path)] != file_hash):
-                new_files.append(file_path)
+            file_key = canon_key(file_path)
+            entry = self.processed_files.get(file_key)
+            
+            # Same size and mtime as last time: unchanged, no need to read the file
+            fingerprint = fast_fingerprint(file_path)
+            if isinstance(entry, dict) and (entry.get("size"), entry.get("mtime_ns")) == fingerprint:
+                continue
+            
+            file_hash = get_file_hash(file_path)
+            stored_hash = entry.get("hash") if isinstance(entry, dict) else entry
+            
+            # Touched but identical, or a legacy string entry: refresh the entry instead of reprocessing
+            if self._matches_stored_hash(file_path, stored_hash, file_hash):
+                self.processed_files[file_key] = state_entry(fingerprint, file_hash)
+                state_changed = True
+                continue
+            
+            # Fingerprint and hash are taken together now, so a file still changing while
+            # it is processed gets a stale mtime and is picked up again next run
+            new_files.append((file_path, state_entry(fingerprint, file_hash)))
+        
+        if state_changed:
+            save_state(self.processed_files, self.state_file)
         
         return new_files
     
+    def _segment_audio(self, file_path: Path, out_dir: Path, segment_seconds: int) -> List[Path]:
+        """Cut an MP3 into fixed-length pieces by copying frames (no decode/re-encode)."""
+        for old_chunk in out_dir.glob("chunk_*.mp3"):
+            old_chunk.unlink()
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", str(file_path),
+             "-f", "segment", "-segment_time", str(segment_seconds), "-c", "copy",
+             "-reset_timestamps", "1", str(out_dir / "chunk_%03d.mp3")],
+            check=True, capture_output=True, text=True
+        )
+        return sorted(out_dir.glob("chunk_*.mp3"))
+    
     def _split_audio_if_needed(self, file_path: Path, max_bytes: int = 25 * 1024 * 1024) -> List[Path]:
         """
         Split the audio file into smaller chunks if it exceeds max_bytes.
         Returns a list of Path objects to the chunk files (original if not split).
+        Chunks live in their own temporary directory, removed by the caller.
         """
         if file_path.stat().st_size <= max_bytes:
             return [file_path]
         
-        print(f"  File {file_path.name} is too large, attempting to split into chunks...")
+        _log(file_path.name, "  File is too large, attempting to split into chunks...")
         
+        chunk_dir = Path(tempfile.mkdtemp(prefix="audio_chunks_"))
         try:
-            audio = AudioSegment.from_file(file_path)
-            chunk_length_ms = 10 * 60 * 1000  # 10 minutes in ms
-            chunks = []
+            chunks = self._segment_audio(file_path, chunk_dir, 10 * 60)
+            if not chunks:
+                raise OSError("FFmpeg wrote no segments")
             
-            for i, start in enumerate(range(0, len(audio), chunk_length_ms)):
-                chunk = audio[start:start + chunk_length_ms]
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp:
-                    chunk.export(tmp.name, format="mp3")
-                    chunk_path = Path(tmp.name)
-                    
-                    if chunk_path.stat().st_size > max_bytes:
-                        # If still too big, split further (5 min)
-                        print(f"    Chunk {i+1} still too large, splitting further...")
-                        sub_chunk_length_ms = 5 * 60 * 1000
-                        for j, sub_start in enumerate(range(0, len(chunk), sub_chunk_length_ms)):
-                            sub_chunk = chunk[sub_start:sub_start + sub_chunk_length_ms]
-                            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as sub_tmp:
-                                sub_chunk.export(sub_tmp.name, format="mp3")
-                                chunks.append(Path(sub_tmp.name))
-                    else:
-                        chunks.append(chunk_path)
+            if any(chunk.stat().st_size > max_bytes for chunk in chunks):
+                # If still too big, split further (5 min)
+                _log(file_path.name, "    Chunks still too large, splitting further...")
+                chunks = self._segment_audio(file_path, chunk_dir, 5 * 60)
+                if not chunks:
+                    raise OSError("FFmpeg wrote no segments")
             
-            print(f"  Successfully split into {len(chunks)} chunks")
+            _log(file_path.name, f"  Successfully split into {len(chunks)} chunks")
             return chunks
             
-        except Exception as e:
-            print(f"  Warning: Audio splitting failed: {str(e)}")
-            print("  This might be due to missing FFmpeg. Please install FFmpeg:")
-            print("    winget install Gyan.FFmpeg")
-            print("  Or download from: https://ffmpeg.org/download.html")
-            print("  Falling back to original file (may fail if too large)...")
+        except (OSError, subprocess.CalledProcessError) as e:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+            error = e.stderr.strip() if isinstance(e, subprocess.CalledProcessError) else str(e)
+            _log(file_path.name,
+                 f"  Warning: Audio splitting failed: {error}",
+                 "  This might be due to missing FFmpeg. Please install FFmpeg:",
+                 "    winget install Gyan.FFmpeg",
+                 "  Or download from: https://ffmpeg.org/download.html",
+                 "  Falling back to original file (may fail if too large)...")
             return [file_path]
     
-    def _transcribe_audio(self, file_path: Path) -> str:
-        """Transcribe audio file using OpenAI Whisper API, splitting if needed."""
-        max_bytes = 25 * 1024 * 1024  # 25MB limit for OpenAI
-        
-        # Check if original file is too large
-        if file_path.stat().st_size > max_bytes:
-            print(f"  File size: {file_path.stat().st_size / (1024*1024):.1f}MB (limit: 25MB)")
-        
-        chunk_paths = self._split_audio_if_needed(file_path, max_bytes=max_bytes)
-        transcript = ""
+    def _compress_for_whisper(self, file_path: Path, file_name: str) -> Path:
+        """
+        Transcode audio to 12 kHz mono Opus at 16 kbps for upload.
+        Whisper resamples to 16 kHz mono internally, so this shrinks uploads
+        several-fold without hurting accuracy. Returns the original path for
+        small clips or if FFmpeg fails; otherwise a temp .ogg the caller deletes.
+        """
+        if file_path.stat().st_size <= 1_000_000:
+            return file_path
         
-        for idx, chunk_path in enumerate(chunk_paths):
-            chunk_size = chunk_path.stat().st_size / (1024*1024)
-            print(f"  Transcribing chunk {idx+1}/{len(chunk_paths)}: {chunk_path.name} ({chunk_size:.1f}MB)")
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.ogg') as tmp:
+            out_path = Path(tmp.name)
+        try:
+            subprocess.run(
+                ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", str(file_path),
+                 "-ac", "1", "-ar", "12000", "-c:a", "libopus", "-b:a", "16k", str(out_path)],
+                check=True, capture_output=True, text=True
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            out_path.unlink(missing_ok=True)
+            _log(file_name, f"  Warning: Compression failed, uploading original audio: {str(e)}")
+            return file_path
+        return out_path
+    
+    def _transcribe_chunk(self, indexed_chunk: Tuple[int, Path], file_name: str,
+                          max_bytes: int = 25 * 1024 * 1024) -> Tuple[int, str]:
+        """Transcribe one audio chunk of recording file_name with Whisper; returns (chunk index, text)."""
+        idx, chunk_path = indexed_chunk
+        upload_path = self._compress_for_whisper(chunk_path, file_name)
+        try:
+            chunk_size = upload_path.stat().st_size / (1024*1024)
+            _log(file_name, f"  Transcribing chunk {idx+1}: {chunk_path.name} ({chunk_size:.1f}MB)")
             
             # Check if chunk is still too large
-            if chunk_path.stat().st_size > max_bytes:
-                print(f"  Warning: Chunk {idx+1} is still too large ({chunk_size:.1f}MB > 25MB)")
-                print("  This chunk will likely fail transcription. Consider:")
-                print("    1. Installing FFmpeg for better audio splitting")
-                print("    2. Manually splitting the audio file")
-                print("    3. Using a smaller audio file")
+            if upload_path.stat().st_size > max_bytes:
+                _log(file_name,
+                     f"  Warning: Chunk {idx+1} is still too large ({chunk_size:.1f}MB > 25MB)",
+                     "  This chunk will likely fail transcription. Consider:",
+                     "    1. Installing FFmpeg for better audio splitting",
+                     "    2. Manually splitting the audio file",
+                     "    3. Using a smaller audio file")
             
             headers = {
                 "Authorization": f"Bearer {self.openai_api_key}"
             }
             
-            try:
-                with open(chunk_path, "rb") as audio_file:
-                    files = {"file": (chunk_path.name, audio_file, "audio/mpeg")}
-                    data = {"model": "whisper-1"}
-                    response = requests.post(
-                        "https://api.openai.com/v1/audio/transcriptions",
-                        headers=headers,
-                        files=files,
-                        data=data
-                    )
-                    if response.status_code == 200:
-                        chunk_transcript = response.json()["text"]
-                        transcript += chunk_transcript + "\n"
-                        print(f"    ✓ Chunk {idx+1} transcribed successfully ({len(chunk_transcript)} characters)")
-                    else:
-                        error_msg = f"Transcription failed for chunk {chunk_path.name}: {response.text}"
-                        if "file too large" in response.text.lower():
-                            error_msg += f"\n    File size: {chunk_size:.1f}MB (limit: 25MB)"
-                        raise Exception(error_msg)
-            except Exception as e:
-                # Clean up temp files before re-raising
-                for temp_path in chunk_paths:
-                    if temp_path != file_path and temp_path.exists():
-                        try:
-                            temp_path.unlink()
-                        except Exception:
-                            pass
-                raise e
-        
-        # Clean up temp files
-        for chunk_path in chunk_paths:
-            if chunk_path != file_path and chunk_path.exists():
-                try:
-                    chunk_path.unlink()
-                except Exception:
-                    pass
+            content_type = "audio/ogg" if upload_path.suffix == ".ogg" else "audio/mpeg"
+            with open(upload_path, "rb") as audio_file:
+                files = {"file": (upload_path.with_stem(chunk_path.stem).name, audio_file, content_type)}
+                data = {"model": "whisper-1"}
+                response = self.session.post(
+                    "https://api.openai.com/v1/audio/transcriptions",
+                    headers=headers,
+                    files=files,
+                    data=data
+                )
+        finally:
+            if upload_path != chunk_path:
+                upload_path.unlink(missing_ok=True)
+        
+        if response.status_code != 200:
+            error_msg = f"Transcription failed for chunk {idx+1} ({chunk_path.name}): {response.text}"
+            if "file too large" in response.text.lower():
+                error_msg += f"\n    File size: {chunk_size:.1f}MB (limit: 25MB)"
+            raise Exception(error_msg)
+        
+        chunk_transcript = response.json()["text"]
+        _log(file_name, f"    ✓ Chunk {idx+1} transcribed successfully ({len(chunk_transcript)} characters)")
+        return idx, chunk_transcript
+    
+    def _transcribe_audio(self, file_path: Path) -> str:
+        """Transcribe audio file using OpenAI Whisper API, splitting if needed."""
+        max_bytes = 25 * 1024 * 1024  # 25MB limit for OpenAI
         
-        return transcript.strip()
+        # Check if original file is too large
+        if file_path.stat().st_size > max_bytes:
+            _log(file_path.name, f"  File size: {file_path.stat().st_size / (1024*1024):.1f}MB (limit: 25MB)")
+        
+        chunk_paths = self._split_audio_if_needed(file_path, max_bytes=max_bytes)
+        
+        try:
+            # Chunks queue on the shared pool; the result order is restored from the chunk index
+            _log(file_path.name, f"  Transcribing {len(chunk_paths)} chunk(s)...")
+            transcribe = partial(self._transcribe_chunk, file_name=file_path.name)
+            results = list(self.chunk_pool.map(transcribe, enumerate(chunk_paths)))
+        finally:
+            # Clean up temp files
+            if chunk_paths != [file_path]:
+                shutil.rmtree(chunk_paths[0].parent, ignore_errors=True)
+        
+        return "\n".join(text for _, text in sorted(results)).strip()
     
-    def _summarize_text(self, text: str) -> str:
-        """Summarize text using OpenAI GPT API."""
-        print("Generating summary...")
+    def _summarize_and_title(self, transcript: str, file_name: str) -> Dict[str, str]:
+        """Summarize the transcript and propose a title in one OpenAI GPT call."""
+        # A descriptive file name is used as the title as-is; only the summary is requested
+        file_title = _descriptive_title(file_name)
+        _log(file_name, "Generating summary..." if file_title else "Generating summary and title...")
+        if file_title:
+            json_shape = '{"summary": "..."}'
+            title_rule = ""
+            request = "summarize"
+        else:
+            json_shape = '{"title": "...", "summary": "..."}'
+            title_rule = "The title is a concise, descriptive title of 3-8 words without quotation marks. "
+            request = "title and summarize"
         
         headers = {
             "Authorization": f"Bearer {self.openai_api_key}",
@@ -200,67 +312,88 @@ class AudioToNotionProcessor:
         }
         
         data = {
-            "model": "gpt-4",
+            "model": CONFIG.title_model,  # a small model is plenty for a short summary
             "messages": [
                 {
                     "role": "system",
-                    "content": "You are a helpful assistant that creates concise, informative summaries of audio transcriptions. Focus on key points, main ideas, and important details."
+                    "content": "You are a helpful assistant that summarizes audio transcriptions and titles them. "
+                               f"Respond with a JSON object of the form {json_shape}. {title_rule}"
+                               f"The summary is concise and informative, at most {SUMMARY_MAX_WORDS} words, focusing on key points, main ideas, and important details."
                 },
                 {
                     "role": "user",
-                    "content": f"Please provide a comprehensive summary of the following audio transcription:\n\n{text}"
+                    "content": f"Audio filename: {file_name}\n\nPlease {request} the following audio transcription:\n\n{transcript}"
                 }
             ],
-            "max_tokens": 500,
+            "response_format": {"type": "json_object"},
+            "max_tokens": 1000,  # headroom over the word cap so the JSON is not cut off
             "temperature": 0.3
         }
         
-        response = requests.post(
+        response = self.session.post(
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
             json=data
         )
         
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"]
-        else:
+        if response.status_code != 200:
             raise Exception(f"Summarization failed: {response.text}")
-    
-    def _generate_title(self, transcript: str) -> str:
-        """Generate a concise title for the audio using OpenAI."""
-        print("Generating AI title...")
-        headers = {
-            "Authorization": f"Bearer {self.openai_api_key}",
-            "Content-Type": "application/json"
+        
+        choice = response.json()["choices"][0]
+        try:
+            if choice.get("finish_reason") == "length":
+                raise ValueError("response hit the token limit")
+            # content is None when the reply was filtered (finish_reason "content_filter")
+            result = json.loads(choice["message"]["content"])
+            if not isinstance(result, dict):
+                raise ValueError("reply is not a JSON object")
+        except (ValueError, TypeError) as e:  # ValueError includes json.JSONDecodeError
+            # Truncated JSON is unusable; a plain summary keeps the (already paid for) transcript
+            _log(file_name, f"  Warning: Summary JSON unusable ({str(e)}), retrying as plain text")
+            return {
+                "title": file_title or Path(file_name).stem,
+                "summary": self._summarize_plain(transcript, headers)
+            }
+        
+        # Remove any quotation marks and excessive whitespace
+        title = file_title or str(result.get("title", "")).replace('"', '').replace("'", '').strip()
+        return {
+            "title": title or "Untitled",
+            "summary": str(result.get("summary", "")).strip()
         }
+    
+    def _summarize_plain(self, transcript: str, headers: Dict[str, str]) -> str:
+        """Plain-text summary fallback; a truncated reply is just a shorter summary."""
         data = {
-            "model": "gpt-4",
+            "model": CONFIG.title_model,
             "messages": [
                 {
                     "role": "system",
-                    "content": "You are an assistant that generates concise, informative titles for audio transcripts. Return only the title, no extra text."
+                    "content": "You are a helpful assistant that creates concise, informative summaries of audio transcriptions. Focus on key points, main ideas, and important details."
                 },
                 {
                     "role": "user",
-                    "content": f"Please propose a short, descriptive title for the following audio transcript.\n\n{transcript[:3000]}"
+                    "content": f"Please provide a comprehensive summary of the following audio transcription:\n\n{transcript}"
                 }
             ],
-            "max_tokens": 20,
-            "temperature": 0.5
+            "max_tokens": 500,
+            "temperature": 0.3
         }
-        response = requests.post(
+        
+        response = self.session.post(
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
             json=data
         )
+        
         if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"].strip().replace('\n', ' ')
+            return response.json()["choices"][0]["message"]["content"].strip()
         else:
-            raise Exception(f"Title generation failed: {response.text}")
+            raise Exception(f"Summarization failed: {response.text}")
     
-    def _create_notion_page(self, file_name: str, transcript: str, summary: str) -> str:
+    def _create_notion_page(self, file_name: str, title: str, transcript: str, summary: str) -> str:
         """Create a new page in Notion database."""
-        print(f"Creating Notion page for: {file_name}")
+        _log(file_name, "Creating Notion page")
 
         headers = {
             "Authorization": f"Bearer {self.notion_token}",
@@ -268,122 +401,30 @@ class AudioToNotionProcessor:
             "Notion-Version": "2022-06-28"
         }
         
-        # Generate a better title using AI
-        title_prompt = f"Generate a concise, descriptive title (3-8 words) for this audio recording. Do not use quotation marks. Return only the title text. Audio filename: {file_name}\n\nTranscript preview: {transcript[:200]}..."
+        # A title taken from the file name already is the name; don't repeat it
+        notion_title = title if title == Path(file_name).stem else f"{title} - {file_name}"
         
-        try:
-            title_response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.openai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4",
-                    "messages": [
-                        {"role": "system", "content": "You are a helpful assistant that generates concise, descriptive titles for audio recordings. Do not use quotation marks. Return only the title text."},
-                        {"role": "user", "content": title_prompt}
-                    ],
-                    "max_tokens": 50,
-                    "temperature": 0.3
-                }
-            )
-            
-            if title_response.status_code == 200:
-                ai_title = title_response.json()["choices"][0]["message"]["content"].strip()
-                # Remove any quotation marks and excessive whitespace
-                ai_title = ai_title.replace('"', '').replace("'", '').strip()
-                # Fallback if title is empty
-                if not ai_title:
-                    ai_title = "Untitled"
-                notion_title = f"{ai_title} - {file_name}"
-            else:
-                notion_title = file_name
-        except Exception as e:
-            print(f"  Warning: Title generation failed: {str(e)}")
-            notion_title = file_name
-        
-        print(f"Proposed title: {notion_title}")
+        _log(file_name, f"Proposed title: {notion_title}")
         
         def split_text(text: str, max_length: int = 1900) -> List[str]:
             if len(text) <= max_length:
                 return [text]
+            # Offsets just past each sentence end or whitespace run, scanned once
+            boundaries = [m.end() for m in re.finditer(r'[.!?]\s*|\s+', text)]
             chunks = []
-            while text:
-                if len(text) <= max_length:
-                    chunks.append(text)
-                    break
-                split_point = max_length
-                for i in range(max_length, max(0, max_length - 100), -1):
-                    if text[i] in '.!?':
-                        split_point = i + 1
-                        break
-                    elif text[i] == ' ':
-                        split_point = i + 1
-                        break
-                chunks.append(text[:split_point])
-                text = text[split_point:].lstrip()
+            cursor = 0
+            while len(text) - cursor > max_length:
+                limit = cursor + max_length
+                i = bisect_right(boundaries, limit) - 1
+                # Break at the last boundary in the final 100 characters, else hard-cut
+                split_point = boundaries[i] if i >= 0 and boundaries[i] > limit - 100 else limit
+                chunks.append(text[cursor:split_point])
+                cursor = split_point
+            chunks.append(text[cursor:])
             return chunks
         transcript_chunks = split_text(transcript)
-        children = [
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": "Summary"
-                            }
-                        }
-                    ]
-                }
-            },
-            {
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": summary
-                            }
-                        }
-                    ]
-                }
-            },
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": "Full Transcript"
-                            }
-                        }
-                    ]
-                }
-            }
-        ]
-        for chunk in transcript_chunks:
-            children.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": chunk
-                            }
-                        }
-                    ]
-                }
-            })
+        children = [_h2("Summary"), _para(summary), _h2("Full Transcript"),
+                    *map(_para, transcript_chunks)]
         page_data = {
             "parent": {"database_id": self.notion_database_id},
             "properties": {
@@ -397,17 +438,63 @@ class AudioToNotionProcessor:
                     ]
                 }
             },
-            "children": children
+            "children": children[:NOTION_MAX_CHILDREN]
         }
-        response = requests.post(
+        response = self.notion_session.post(
             "https://api.notion.com/v1/pages",
             headers=headers,
             json=page_data
         )
-        if response.status_code == 200:
-            return response.json()["id"]
-        else:
+        if response.status_code != 200:
             raise Exception(f"Notion page creation failed: {response.text}")
+        page_id = response.json()["id"]
+        
+        # Notion accepts at most 100 children per request; append the rest in order.
+        # Batches go one after another because each append lands at the end of the page.
+        try:
+            for start in range(NOTION_MAX_CHILDREN, len(children), NOTION_MAX_CHILDREN):
+                response = self.notion_session.patch(
+                    f"https://api.notion.com/v1/blocks/{page_id}/children",
+                    headers=headers,
+                    json={"children": children[start:start + NOTION_MAX_CHILDREN]}
+                )
+                if response.status_code != 200:
+                    raise Exception(f"Notion block append failed for page {page_id}: {response.text}")
+        except Exception:
+            # The file will be retried next run; don't leave a half-written duplicate behind
+            self._archive_notion_page(page_id, headers, file_name)
+            raise
+        
+        return page_id
+    
+    def _archive_notion_page(self, page_id: str, headers: Dict[str, str], file_name: str):
+        """Archive (move to trash) a Notion page; failures are reported, not raised."""
+        try:
+            response = self.notion_session.patch(
+                f"https://api.notion.com/v1/pages/{page_id}",
+                headers=headers,
+                json={"archived": True}
+            )
+            if response.status_code == 200:
+                _log(file_name, f"  Archived incomplete Notion page {page_id}")
+                return
+            error = response.text
+        except Exception as e:
+            error = str(e)
+        _log(file_name, f"  Warning: Could not archive incomplete Notion page {page_id}: {error}")
+    
+    def _process_one(self, file_path: Path, entry: Dict) -> Tuple[Path, str, Dict]:
+        """Transcribe, summarize and publish one file; returns (path, page ID, state entry)."""
+        # Transcribe the audio
+        transcript = self._transcribe_audio(file_path)
+        
+        # Summarize and title the transcript in one call
+        result = self._summarize_and_title(transcript, file_path.name)
+        
+        # Create Notion page
+        page_id = self._create_notion_page(file_path.name, result["title"], transcript, result["summary"])
+        
+        return file_path, page_id, entry
     
     def process_new_files(self) -> List[str]:
         """Process all new MP3 files and return list of created page IDs."""
@@ -418,34 +505,31 @@ class AudioToNotionProcessor:
             return []
         
         print(f"Found {len(new_files)} new files to process:")
-        for file_path in new_files:
+        for file_path, _ in new_files:
             print(f"  - {file_path.name}")
         
         created_pages = []
         
-        for file_path in new_files:
-            try:
-                # Transcribe the audio
-                transcript = self._transcribe_audio(file_path)
-                
-                # Summarize the transcript
-                summary = self._summarize_text(transcript)
+        # Each file is pure API I/O (Whisper, GPT, Notion), so files run side by side
+        with ThreadPoolExecutor(max_workers=CONFIG.audio_workers) as ex:
+            futures = {ex.submit(self._process_one, file_path, entry): file_path
+                       for file_path, entry in new_files}
+            
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    _, page_id, entry = future.result()
+                except Exception as e:
+                    _log(file_path.name, f"✗ Error processing: {str(e)}")
+                    continue
                 
-                # Create Notion page
-                page_id = self._create_notion_page(file_path.name, transcript, summary)
                 created_pages.append(page_id)
                 
-                # Update state
-                self.processed_files[str(file_path)] = self._get_file_hash(file_path)
+                # Update state as each file finishes, so a crash keeps earlier progress
+                self.processed_files[canon_key(file_path)] = entry
+                save_state(self.processed_files, self.state_file)
                 
-                print(f"✓ Successfully processed: {file_path.name}")
-                
-            except Exception as e:
-                print(f"✗ Error processing {file_path.name}: {str(e)}")
-                continue
-        
-        # Save updated state
-        self._save_state()
+                _log(file_path.name, "✓ Successfully processed")
         
         return created_pages
     
@@ -464,30 +548,29 @@ class AudioToNotionProcessor:
 def main():
     """Main function to run the audio processor."""
     # Configuration
-    FOLDER_PATH = os.getenv("AUDIO_FOLDER_PATH", "./audio_files")
+    FOLDER_PATH = CONFIG.audio_folder_path or "./audio_files"
     STATE_FILE = "data/audio_processing_state.json"
     
     try:
-        # Initialize processor
-        processor = AudioToNotionProcessor(FOLDER_PATH, STATE_FILE)
-        
-        # Get stats before processing
-        stats_before = processor.get_processing_stats()
-        print(f"Processing stats: {stats_before}")
-        
-        # Process new files
-        created_pages = processor.process_new_files()
-        
-        if created_pages:
-            print(f"\n✓ Successfully created {len(created_pages)} Notion pages:")
-            for page_id in created_pages:
-                print(f"  - Page ID: {page_id}")
-        else:
-            print("\nNo new pages created.")
-        
-        # Get stats after processing
-        stats_after = processor.get_processing_stats()
-        print(f"\nFinal stats: {stats_after}")
+        # Initialize processor; closing it shuts down the chunk pool
+        with AudioToNotionProcessor(FOLDER_PATH, STATE_FILE) as processor:
+            # Get stats before processing
+            stats_before = processor.get_processing_stats()
+            print(f"Processing stats: {stats_before}")
+            
+            # Process new files
+            created_pages = processor.process_new_files()
+            
+            if created_pages:
+                print(f"\n✓ Successfully created {len(created_pages)} Notion pages:")
+                for page_id in created_pages:
+                    print(f"  - Page ID: {page_id}")
+            else:
+                print("\nNo new pages created.")
+            
+            # Get stats after processing
+            stats_after = processor.get_processing_stats()
+            print(f"\nFinal stats: {stats_after}")
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -0,0 +1,50 @@
+"""
+Environment configuration shared by the audio, Zotero and setup scripts.
+
+The .env file is parsed once and every variable is read into a frozen
+Config, so scripts use attribute access instead of scattered os.getenv
+calls (a typo becomes an AttributeError rather than a silent None).
+"""
+
+import os
+from dataclasses import dataclass, fields
+from typing import Optional
+from dotenv import load_dotenv
+
+@dataclass(frozen=True)
+class Config:
+    openai_api_key: Optional[str] = None
+    notion_token: Optional[str] = None
+    notion_database_id: Optional[str] = None
+    zotero_api_key: Optional[str] = None
+    zotero_user_id: Optional[str] = None
+    zotero_library_type: str = "user"
+    audio_folder_path: Optional[str] = None
+    title_model: str = "gpt-4o-mini"
+    use_batch_api: bool = False
+    audio_workers: int = 8
+
+    @classmethod
+    def load(cls) -> "Config":
+        """Load .env once and read each field from its upper-case variable."""
+        load_dotenv()
+        values = {}
+        for field in fields(cls):
+            value = os.environ.get(field.name.upper())
+            if not value:
+                continue
+            if field.type is bool:
+                values[field.name] = value == "1"
+            elif field.type is int:
+                values[field.name] = int(value)
+            else:
+                values[field.name] = value
+        return cls(**values)
+
+    def require(self, *names: str):
+        """Raise ValueError naming every listed variable that is not set."""
+        missing = [name.upper() for name in names if not getattr(self, name)]
+        if missing:
+            raise ValueError(f"Missing required environment variable(s): {', '.join(missing)}")
+
+CONFIG = Config.load()
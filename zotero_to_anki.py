@@ -17,8 +17,10 @@
 
 
 # %% # ## imports
-import os, html2text, requests
-from dotenv import load_dotenv
+import html2text, re, threading
+from concurrent.futures import ThreadPoolExecutor
+from config import CONFIG
+from _http import make_session
 from pyzotero import zotero
 
 # %%
@@ -52,58 +54,81 @@ libraries = [
 # %%
 # ## main code
 # ─── Config ────────────────────────────────────────────────────────────────
-load_dotenv()
-ZOTERO = zotero.Zotero(
-    os.getenv("ZOTERO_USER_ID"),
-    os.getenv("ZOTERO_LIBRARY_TYPE", "user"),
-    os.getenv("ZOTERO_API_KEY")
-)
+CONFIG.require("zotero_user_id", "zotero_api_key", "openai_api_key")
 ANKI_URL       = "http://127.0.0.1:8765"
 OPENAI_URL     = "https://api.openai.com/v1/chat/completions"
-OPENAI_KEY     = os.getenv("OPENAI_API_KEY")
+OPENAI_KEY     = CONFIG.openai_api_key
+SESSION        = make_session(pool_connections=16, pool_maxsize=32,   # keep-alive for Anki + OpenAI
+                              backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
 VERBOSE        = True   # ← flip to False to silence output
 
-H2M = html2text.HTML2Text();  H2M.ignore_links = True
+PIPELINE_WORKERS = 4   # libraries processed at once (network-bound)
+PAGE_WORKERS     = 4   # Zotero result pages fetched at once, across all pipelines
+
+# One long-lived pool serves every listing, so its threads (and their pyzotero
+# clients) are reused; at most PIPELINE_WORKERS + PAGE_WORKERS Zotero calls run at once
+PAGE_POOL   = ThreadPoolExecutor(max_workers=PAGE_WORKERS)
+
+# pyzotero clients and html2text parsers keep per-call state → one per thread
+_LOCAL      = threading.local()
+_PRINT_LOCK = threading.Lock()
+_DECKS_LOCK = threading.Lock()   # guards the deck set shared by all pipelines
+
+# Zotero prefixes the heading with a long data-citation-items attribute, so scan the whole note
+_ANNOTATIONS_RE = re.compile("annotations", re.IGNORECASE)
+
+def zot():
+    if not hasattr(_LOCAL, "zotero"):
+        _LOCAL.zotero = zotero.Zotero(
+            CONFIG.zotero_user_id,
+            CONFIG.zotero_library_type,
+            CONFIG.zotero_api_key
+        )
+    return _LOCAL.zotero
+
+def h2m():
+    if not hasattr(_LOCAL, "h2m"):
+        _LOCAL.h2m = html2text.HTML2Text();  _LOCAL.h2m.ignore_links = True
+    return _LOCAL.h2m
 
 # ─── Helpers ───────────────────────────────────────────────────────────────
+def tprint(*msg):
+    with _PRINT_LOCK: print(*msg)   # keep lines from parallel pipelines intact
+
 def vprint(*msg):
-    if VERBOSE: print(*msg)
+    if VERBOSE: tprint(*msg)
+
+def fetch_pages(fetch_page, limit=100):
+    # page 0 carries Total-Results, so the remaining offsets are fetched side by side (in order)
+    first  = fetch_page(0)
+    total  = int(zot().request.headers.get("Total-Results", len(first)))
+    rest   = PAGE_POOL.map(fetch_page, range(limit, total, limit))
+    return first + [x for page in rest for x in page]
 
 def all_collections(limit=100):
-    out, start = [], 0
-    while True:
-        page = ZOTERO.collections(limit=limit, start=start)
-        out.extend(page)
-        if len(page) < limit: break
-        start += limit
-    return out
+    return fetch_pages(lambda start: zot().collections(limit=limit, start=start), limit)
 
 def fetch_items(coll_key, limit=100):
-    out, start = [], 0
-    while True:
-        page = ZOTERO.collection_items(coll_key, limit=limit, start=start)
-        out.extend(page)
-        if len(page) < limit: break
-        start += limit
-    return out
+    return fetch_pages(lambda start: zot().collection_items(coll_key, limit=limit, start=start), limit)
 
 def existing_decks():
-    r = requests.post(ANKI_URL, json={"action":"deckNames","version":6}).json()
+    r = SESSION.post(ANKI_URL, json={"action":"deckNames","version":6}).json()
     return set(r.get("result", []))
 
 def ensure_deck(deck):
-    requests.post(ANKI_URL, json={
+    SESSION.post(ANKI_URL, json={
         "action":"createDeck","version":6,"params":{"deck":deck}
     })
 
-def push_card(deck, front, back):
-    requests.post(ANKI_URL, json={
+def push_cards(deck, cards):
+    # one addNotes call (and one Anki transaction) for the whole deck
+    SESSION.post(ANKI_URL, json={
         "action":"addNotes","version":6,
         "params":{"notes":[{
             "deckName":deck,"modelName":"Basic",
-            "fields":{"Front":front,"Back":back},
+            "fields":{"Front":q,"Back":a},
             "tags":["paper","notecard"]
-        }]}
+        } for q, a in cards]}
     })
 
 def generate_cards(text):
@@ -131,7 +156,7 @@ def generate_cards(text):
             {"role":"user","content":text}
         ]
     }
-    r = requests.post(OPENAI_URL, headers=hdr, json=data).json()
+    r = SESSION.post(OPENAI_URL, headers=hdr, json=data).json()
     return r["choices"][0]["message"]["content"]
 
 def parse_cards(txt):
@@ -147,21 +172,17 @@ def parse_cards(txt):
     return out
 
 # ─── Main ───────────────────────────────────────────────────────────────────
-def run_pipeline(collection_name):
+def run_pipeline(collection_name, decks_exist):
 
     PARENT_DECK    = f"CMU.49.007 Automated Literature Review::{collection_name}"
     vprint(f"Looking for collection: {collection_name}")
 
     # error handling for finding collections
-    try:
-        coll_key = next(
-            c["data"]["key"] for c in all_collections()
-            if c["data"]["name"] == collection_name
-        )
-        vprint("Collection key:", coll_key)
-    except StopIteration:
-        print(f"Error: Cannot find collection: {collection_name}")
+    coll_key = COLL_BY_NAME.get(collection_name)
+    if coll_key is None:
+        tprint(f"Error: Cannot find collection: {collection_name}")
         return
+    vprint("Collection key:", coll_key)
 
     items = fetch_items(coll_key)
     vprint(f"Total items pulled: {len(items)}")
@@ -172,18 +193,30 @@ def run_pipeline(collection_name):
     # index every pulled item by key so we can walk parent links fast
     items_by_key = {i["key"]: i for i in items}
 
+    _top_cache = {}           # item key → its top‑level key, shared by sibling notes
+
     def top_level_key(k):
         """Follow parentItem links until we reach a top‑level item."""
-        while True:
+        seen = []
+        while k not in _top_cache:
             itm = items_by_key.get(k)
             parent = itm and itm["data"].get("parentItem")
             if not parent:
-                return k          # k is now a top‑level item
+                _top_cache[k] = k # k is now a top‑level item
+                break
+            seen.append(k)
             k = parent            # climb one level
+        root = _top_cache[k]
+        for s in seen:            # every key on the climbed chain shares this root
+            _top_cache[s] = root
+        return root
 
     annos = {}
     for n in notes:
-        md = H2M.handle(n["data"]["note"]).strip()
+        raw = n["data"]["note"]
+        if not _ANNOTATIONS_RE.search(raw):
+            continue              # cheap raw-HTML check before the html2text parse
+        md = h2m().handle(raw).strip()
         head = md.lower()[:80]
         if "annotations" not in head:
             continue
@@ -194,12 +227,12 @@ def run_pipeline(collection_name):
 
     # troubleshooting: used to make sure the right notes are captured
     for pid, txts in annos.items():
-        print(f"PARENT {pid}: {len(txts)} annotation‑notes")
+        tprint(f"PARENT {pid}: {len(txts)} annotation‑notes")
         # If you want to see the first 60 chars of each note:
         for t in txts:
-            print("   ↳", repr(t[:60]))
+            tprint("   ↳", repr(t[:60]))
 
-    print(f"[+] Papers with matching notes: {len(annos)}")
+    tprint(f"[+] Papers with matching notes: {len(annos)}")
 
     papers_by_id = {
         i["key"]: i for i in items
@@ -207,8 +240,6 @@ def run_pipeline(collection_name):
     }
     vprint(f"Papers: {len(papers_by_id)}   Notes: {len(notes)}")
 
-    decks_exist = existing_decks()
-
     for pid, txts in annos.items():
         paper = papers_by_id.get(pid)
         if not paper:
@@ -221,13 +252,14 @@ def run_pipeline(collection_name):
         deck    = f"{PARENT_DECK}::{author} et al., {year}"
 
         # ── Skip the entire paper if its deck already exists ─────────
-        if deck in decks_exist:
+        with _DECKS_LOCK:
+            is_new = deck not in decks_exist
+            if is_new: decks_exist.add(deck)   # claim it before creating
+        if not is_new:
             vprint(f"Deck already exists → skip: {deck}")
             continue
-        else:
-            ensure_deck(deck)
-            decks_exist.add(deck)
-            vprint("Created deck:", deck)
+        ensure_deck(deck)
+        vprint("Created deck:", deck)
 
         # ── Only reaches here if the deck is new ─────────────────────
         notes_block = "\n\n".join(txts)
@@ -235,8 +267,12 @@ def run_pipeline(collection_name):
         cards = parse_cards(generate_cards(notes_block))
         vprint(f"  → {len(cards)} cards")
 
-        for q, a in cards:
-            push_card(deck, q, a)
+        push_cards(deck, cards)
+
+# listed once for all libraries; reversed so the first collection with a name wins, as before
+COLL_BY_NAME = {c["data"]["name"]: c["data"]["key"] for c in reversed(all_collections())}
+decks_exist  = existing_decks()   # one deckNames call, updated as decks are created
 
-for collection_name in libraries:
-    run_pipeline(collection_name)
+with ThreadPoolExecutor(max_workers=PIPELINE_WORKERS) as ex:
+    list(ex.map(lambda name: run_pipeline(name, decks_exist), libraries))
+PAGE_POOL.shutdown()